@@ -3,6 +3,7 @@ import sys
 import cv2
 import numpy as np
 from scipy import ndimage
+from svg_writer import write_svg
 
 
 def fast_skeletonize(img):
@@ -117,11 +118,7 @@ def convert(png, svg):
 
     # SVG
     h, w = img.shape
-    path_data = "M " + " L ".join(f"{x} {y}" for x, y in points)
-    
-    with open(svg, "w") as f:
-        f.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{w}" height="{h}" viewBox="0 0 {w} {h}">'
-                f'<path d="{path_data}" stroke="black" fill="none" stroke-width="1"/></svg>')
+    write_svg(svg, [points], w, h)
     
     print("OK:", svg)
 
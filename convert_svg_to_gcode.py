@@ -1,10 +1,18 @@
 #!/usr/bin/env python3
+import time
+STARTED_AT = time.perf_counter()
+
 import sys
 import os
 import re
 import xml.etree.ElementTree as ET
-from svg_to_gcode.svg_parser import parse_file
-from svg_to_gcode.compiler import Compiler, interfaces
+
+from startup_timings import lazy_import, stage, record_stage, pop_timings_flag, report
+
+record_stage("module imports", STARTED_AT)
+
+# Размер буфера записи G-кода в файл
+WRITE_BUFFER_SIZE = 64 * 1024
 
 
 def clean_svg_namespaces(input_svg: str, cleaned_svg: str):
@@ -57,42 +65,83 @@ def clean_svg_namespaces(input_svg: str, cleaned_svg: str):
         return False
 
 
-def optimize_gcode_commands(gcode_file: str):
-    """Оптимизирует G-код для удаления лишних перемещений"""
-    try:
-        with open(gcode_file, 'r') as f:
-            lines = f.readlines()
-        
-        optimized_lines = []
-        last_command = None
-        last_position = None
-        
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith(';'):
-                optimized_lines.append(line + '\n')
+def iter_optimized_gcode(lines):
+    """Построчно выдает G-код без дублирующихся команд перемещения"""
+    last_command = None
+    last_position = None
+
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith(';'):
+            yield line + '\n'
+            continue
+
+        # Удаляем дублирующиеся команды перемещения
+        if line.startswith('G0') or line.startswith('G1'):
+            if line == last_command:
                 continue
-                
-            # Удаляем дублирующиеся команды перемещения
-            if line.startswith('G0') or line.startswith('G1'):
-                if line == last_command:
-                    continue
-                    
-                # Проверяем изменение позиции
-                if last_position and line == last_position:
-                    continue
-                    
-                last_command = line
-                last_position = line
-            
-            optimized_lines.append(line + '\n')
-        
-        # Перезаписываем файл с оптимизированными командами
-        with open(gcode_file, 'w') as f:
-            f.writelines(optimized_lines)
-            
-    except Exception as e:
-        pass
+
+            # Проверяем изменение позиции
+            if last_position and line == last_position:
+                continue
+
+            last_command = line
+            last_position = line
+
+        yield line + '\n'
+
+
+def iter_compiled_gcode(compiler, curves, passes: int = 1):
+    """Выдает команды G-кода так же, как Compiler.compile, но по одной.
+
+    Тело прохода не накапливается в compiler.body: каждая кривая компилируется
+    и сразу отдается, а для следующего прохода кривые компилируются заново.
+    """
+    interface = compiler.interface
+
+    yield from compiler.header
+    yield interface.set_unit(compiler.unit)
+
+    for i in range(passes):
+        # Каждый проход начинается с тех же команд, что и первый
+        interface.position = None
+        for curve in curves:
+            compiler.append_curves([curve])
+            yield from compiler.body
+            compiler.body.clear()
+
+        # Если это не последний проход, выключаем лазер и опускаемся
+        if i < passes - 1:
+            yield interface.laser_off()
+
+            if compiler.pass_depth > 0:
+                yield interface.set_relative_coordinates()
+                yield interface.linear_move(z=-compiler.pass_depth)
+                yield interface.set_absolute_coordinates()
+
+    yield from compiler.footer
+
+
+def iter_gcode_lines(curves,
+                     movement_speed: float = 3000,
+                     cutting_speed: float = 1000,
+                     passes: int = 1,
+                     pass_depth: float = 1.0):
+    """Построчно выдает оптимизированный G-код для кривых.
+
+    Строки можно отправлять контроллеру по мере генерации, не дожидаясь
+    записи файла.
+    """
+    compiler_module = lazy_import("svg_to_gcode.compiler")
+    compiler = compiler_module.Compiler(
+        compiler_module.interfaces.Gcode,
+        movement_speed=movement_speed,
+        cutting_speed=cutting_speed,
+        pass_depth=pass_depth
+    )
+
+    commands = (command for command in iter_compiled_gcode(compiler, curves, passes) if command)
+    return iter_optimized_gcode(commands)
 
 
 def find_output_file(output_gcode: str):
@@ -142,7 +191,9 @@ def convert_svg_to_gcode(input_svg: str, output_gcode: str,
     tmp_svg = os.path.splitext(output_gcode)[0] + "_clean.svg"
 
     # Очищаем SVG от namespace и потенциально проблемных элементов
-    if not clean_svg_namespaces(input_svg, tmp_svg):
+    with stage("clean"):
+        cleaned = clean_svg_namespaces(input_svg, tmp_svg)
+    if not cleaned:
 
         return False
 
@@ -152,8 +203,12 @@ def convert_svg_to_gcode(input_svg: str, output_gcode: str,
         return False
 
     try:
-        # Парсим SVG с дополнительными опциями
-        curves = parse_file(tmp_svg)
+        # svg_to_gcode загружаем только после успешной проверки входных данных
+        with stage("parse"):
+            svg_parser = lazy_import("svg_to_gcode.svg_parser")
+
+            # Парсим SVG с дополнительными опциями
+            curves = svg_parser.parse_file(tmp_svg)
         
         if not curves:
 
@@ -165,31 +220,16 @@ def convert_svg_to_gcode(input_svg: str, output_gcode: str,
 
 
 
-        # Компилируем в G-code с оптимизацией
-        compiler = Compiler(
-            interfaces.Gcode,
-            movement_speed=movement_speed,
-            cutting_speed=cutting_speed,
-            pass_depth=pass_depth
-        )
+        # Компилируем и оптимизируем G-код, записывая его в файл построчно
+        with stage("compile"), open(output_gcode, 'w', buffering=WRITE_BUFFER_SIZE) as f:
+            f.writelines(iter_gcode_lines(
+                curves,
+                movement_speed=movement_speed,
+                cutting_speed=cutting_speed,
+                passes=passes,
+                pass_depth=pass_depth
+            ))
 
-        # Добавляем кривые с проверкой
-        compiler.append_curves(curves)
-        
-        # Компилируем в файл
-        compiler.compile_to_file(output_gcode, passes=passes)
-
-        # Оптимизируем G-код для удаления лишних команд
-        if os.path.exists(output_gcode):
-            optimize_gcode_commands(output_gcode)
-
-            
-            # Показываем статистику
-            with open(output_gcode, 'r') as f:
-                lines = f.readlines()
-                gcode_lines = [l for l in lines if l.strip() and not l.startswith(';')]
-               
-                
         # Ищем файл вывода
         find_output_file(output_gcode)
         
@@ -207,22 +247,27 @@ def convert_svg_to_gcode(input_svg: str, output_gcode: str,
 
 
 def main():
-    if len(sys.argv) < 3:
+    args, timings = pop_timings_flag(sys.argv[1:])
+    if len(args) < 2:
         
         sys.exit(1)
 
-    input_svg = sys.argv[1]
-    output_gcode = sys.argv[2]
-    scale = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
-    pass_depth = float(sys.argv[4]) if len(sys.argv) > 4 else 1.0
+    input_svg = args[0]
+    output_gcode = args[1]
+    scale = float(args[2]) if len(args) > 2 else 1.0
+    pass_depth = float(args[3]) if len(args) > 3 else 1.0
 
 
-    success = convert_svg_to_gcode(
-        input_svg, 
-        output_gcode, 
-        scale=scale,
-        pass_depth=pass_depth
-    )
+    try:
+        success = convert_svg_to_gcode(
+            input_svg, 
+            output_gcode, 
+            scale=scale,
+            pass_depth=pass_depth
+        )
+    finally:
+        if timings:
+            report(STARTED_AT)
 
     if success:
         pass
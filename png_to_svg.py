@@ -1,15 +1,25 @@
 #!/usr/bin/env python3
+import time
+STARTED_AT = time.perf_counter()
+
+import os
 import sys
-import cv2
-import numpy as np
-import networkx as nx
-from skimage import morphology
-import itertools
-from collections import deque
+
+from startup_timings import lazy_import, stage, record_stage, pop_timings_flag, report
+from svg_writer import write_svg
+
+record_stage("module imports", STARTED_AT)
 
 def find_continuous_path(binary_img):
     """Находит непрерывный путь через все линии изображения с возможностью многократного прохода"""
+    np = lazy_import("numpy")
+
+    # Пустое изображение сразу уходит в fallback по контурам без skimage и networkx
+    if not np.any(binary_img):
+        return []
+
     # Создаем скелет
+    morphology = lazy_import("skimage.morphology")
     skeleton = morphology.skeletonize(binary_img > 0)
     skeleton = skeleton.astype(np.uint8) * 255
     
@@ -31,6 +41,8 @@ def find_continuous_path(binary_img):
 
 def build_skeleton_graph(skeleton):
     """Строит граф из скелета изображения"""
+    np = lazy_import("numpy")
+    nx = lazy_import("networkx")
     G = nx.Graph()
     
     # Добавляем все точки скелета как узлы
@@ -59,6 +71,8 @@ def find_eulerian_path(G):
     """Находит эйлеров путь или путь китайского почтальона"""
     if len(G.edges) == 0:
         return []
+
+    nx = lazy_import("networkx")
     
     # Проверяем, является ли граф эйлеровым
     if nx.is_eulerian(G):
@@ -87,7 +101,9 @@ def chinese_postman_path(G):
     """Реализация алгоритма китайского почтальона с минимальными дублированиями"""
     if len(G) == 0:
         return []
-    
+
+    nx = lazy_import("networkx")
+
     # Создаем копию графа для работы
     G_working = G.copy()
     path = []
@@ -208,7 +224,9 @@ def simplify_path(points, tolerance=2.0):
     """Упрощает путь используя алгоритм Рамера-Дугласа-Пекера"""
     if len(points) < 3:
         return points
-    
+
+    np = lazy_import("numpy")
+
     def perpendicular_distance(point, line_start, line_end):
         """Вычисляет перпендикулярное расстояние от точки до линии"""
         if line_start == line_end:
@@ -269,6 +287,8 @@ def simplify_path(points, tolerance=2.0):
 
 def enhance_skeleton_detection(binary_img):
     """Улучшает обнаружение скелета, чтобы включить все линии"""
+    cv2 = lazy_import("cv2")
+
     # Убираем шум
     cleaned = cv2.morphologyEx(binary_img, cv2.MORPH_OPEN, 
                              cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2, 2)))
@@ -280,55 +300,63 @@ def enhance_skeleton_detection(binary_img):
     return cleaned
 
 def convert(png, svg):
-    img = cv2.imread(png, cv2.IMREAD_GRAYSCALE)
+    # Проверяем вход до загрузки OpenCV, чтобы ошибочный запуск завершался быстро
+    if not os.path.isfile(png):
+        raise Exception("Cannot read PNG")
+
+    with stage("read"):
+        cv2 = lazy_import("cv2")
+        img = cv2.imread(png, cv2.IMREAD_GRAYSCALE)
     if img is None:
         raise Exception("Cannot read PNG")
 
-    # Бинаризация
-    _, binary = cv2.threshold(img, 128, 255, cv2.THRESH_BINARY_INV)
-    
-    # Улучшаем обнаружение скелета
-    enhanced_binary = enhance_skeleton_detection(binary)
-    
-    # Находим непрерывный путь
-    path_points = find_continuous_path(enhanced_binary)
-    
-    if not path_points:
-        # Fallback: используем контуры
-        contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        if contours:
-            path_points = [tuple(point[0]) for contour in contours for point in contour]
-    
-    if not path_points:
+    with stage("binarize"):
+        # Бинаризация
+        _, binary = cv2.threshold(img, 128, 255, cv2.THRESH_BINARY_INV)
+
+        # Улучшаем обнаружение скелета
+        enhanced_binary = enhance_skeleton_detection(binary)
+
+    with stage("trace"):
+        # Находим непрерывный путь
+        path_points = find_continuous_path(enhanced_binary)
+    strokes = [path_points] if path_points else []
+
+    if not strokes:
+        with stage("contours"):
+            # Fallback: используем контуры, каждый контур - отдельный замкнутый штрих
+            np = lazy_import("numpy")
+            contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            strokes = []
+            for contour in contours:
+                points = contour.reshape(-1, 2)
+                strokes.append(np.vstack((points, points[:1])))
+    
+    if not strokes:
         raise Exception("No continuous path found")
 
-    # Создаем SVG
+    # Создаем SVG, путь пишется в файл по частям
     h, w = binary.shape
     
-    if len(path_points) > 1:
-        path_data = f"M {path_points[0][0]} {path_points[0][1]}"
-        for x, y in path_points[1:]:
-            path_data += f" L {x} {y}"
-    else:
-        path_data = f"M {path_points[0][0]} {path_points[0][1]}"
-    
-    with open(svg, "w") as f:
-        f.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{w}" height="{h}" viewBox="0 0 {w} {h}">'
-                f'<path d="{path_data}" stroke="black" fill="none" stroke-width="1"/></svg>')
+    with stage("write"):
+        write_svg(svg, strokes, w, h)
         
     print("OK:", svg)
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: converter.py input.png output.svg")
+    args, timings = pop_timings_flag(sys.argv[1:])
+    if len(args) != 2:
+        print("Usage: converter.py input.png output.svg [--timings]")
         sys.exit(1)
     
     # Увеличиваем лимит рекурсии для сложных изображений
-    import sys
     sys.setrecursionlimit(10000)
     
     try:
-        convert(sys.argv[1], sys.argv[2])
+        convert(args[0], args[1])
     except Exception as e:
         print(f"Error: {e}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+    finally:
+        if timings:
+            report(STARTED_AT)
\ No newline at end of file
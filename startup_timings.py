@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Ленивый импорт тяжелых зависимостей и отчет о времени запуска для CLI-скриптов"""
+import sys
+import time
+import importlib
+from contextlib import contextmanager
+
+_import_times = {}
+_stage_times = []
+
+
+def lazy_import(name):
+    """Импортирует модуль при первом обращении и запоминает время импорта.
+
+    Если модуль уже был загружен другим модулем (например, numpy через cv2),
+    это отмечается в отчете вместо времени.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        _import_times.setdefault(name, None)
+        return module
+
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    _import_times[name] = time.perf_counter() - start
+    return module
+
+
+def record_stage(name, started_at):
+    """Записывает этап, начавшийся в момент started_at и закончившийся сейчас"""
+    _stage_times.append((name, time.perf_counter() - started_at))
+
+
+@contextmanager
+def stage(name):
+    """Замеряет время выполнения этапа конвертации"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, start)
+
+
+def pop_timings_flag(argv):
+    """Удаляет флаг --timings из аргументов и сообщает, был ли он передан"""
+    args = [arg for arg in argv if arg != "--timings"]
+    return args, len(args) != len(argv)
+
+
+def report(started_at, stream=None):
+    """Печатает время ленивых импортов, этапов и общее время с первой строки скрипта.
+
+    Время запуска самого интерпретатора сюда не входит; подробную разбивку
+    импортов по модулям дает `python -X importtime`.
+    """
+    stream = stream or sys.stderr
+    print("timings: cumulative [us] | name", file=stream)
+    for name, elapsed in _stage_times:
+        print(f"stage:       {int(elapsed * 1e6):>14} | {name}", file=stream)
+    for name, elapsed in _import_times.items():
+        value = "already loaded" if elapsed is None else int(elapsed * 1e6)
+        print(f"lazy import: {value:>14} | {name}", file=stream)
+    total = time.perf_counter() - started_at
+    print(f"total:       {int(total * 1e6):>14} | main", file=stream)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Потоковая запись SVG: путь выдается частями и не собирается целиком в памяти"""
+
+# Максимум точек в одном элементе <path>; длинные штрихи делятся на несколько элементов
+PATH_CHUNK_POINTS = 1000
+# Размер буфера записи в файл
+WRITE_BUFFER_SIZE = 64 * 1024
+
+
+def iter_path_data(points, chunk_points=PATH_CHUNK_POINTS):
+    """Выдает атрибуты d для последовательных частей одного штриха.
+
+    Каждая следующая часть начинается с последней точки предыдущей,
+    поэтому линия на рисунке остается непрерывной.
+    """
+    if chunk_points < 2:
+        raise ValueError("chunk_points must be at least 2")
+
+    parts = []
+    flushed = False
+    for x, y in points:
+        parts.append(f"L {x} {y}" if parts else f"M {x} {y}")
+        if len(parts) >= chunk_points:
+            yield " ".join(parts)
+            parts = [f"M {x} {y}"]
+            flushed = True
+
+    # После сброса остается только стартовая точка, отдельный путь для нее не нужен
+    if parts and not (flushed and len(parts) == 1):
+        yield " ".join(parts)
+
+
+def iter_svg(strokes, width, height, chunk_points=PATH_CHUNK_POINTS):
+    """Выдает SVG-документ по частям: заголовок, элементы <path> каждого штриха, закрывающий тег"""
+    yield f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+    for stroke in strokes:
+        for path_data in iter_path_data(stroke, chunk_points):
+            yield f'<path d="{path_data}" stroke="black" fill="none" stroke-width="1"/>'
+    yield '</svg>'
+
+
+def write_svg(svg, strokes, width, height, chunk_points=PATH_CHUNK_POINTS):
+    """Записывает SVG в файл через буферизованный поток"""
+    with open(svg, "w", buffering=WRITE_BUFFER_SIZE) as f:
+        for chunk in iter_svg(strokes, width, height, chunk_points):
+            f.write(chunk)